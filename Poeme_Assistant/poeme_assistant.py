@@ -15,7 +15,8 @@ License: MIT
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import re, random, datetime
+import re, random, datetime, functools, itertools, bisect, threading
+from collections import Counter, defaultdict
 
 # -----------------------------
 # Small seed corpora (public domain fragments / generic lines)
@@ -42,20 +43,58 @@ CORPUS_RO = (
     "și scriem zorilor scrisori de rai\n"
 )
 
-STOPWORDS_EN = set("the a an and or of in on at for with by to from into over under is are was were be as that this those these it we you i they them us our your their".split())
-STOPWORDS_RO = set("și sau ori de din la pe pentru cu prin sub peste într-un într-o în într înspre este sunt eram ești e suntem sunteți un o niște ce că întru către mai prea iar dar să nu nici ci precum căci ai am au îl îți ți îmi mi ți-l își își-l vă vouă ne nouă lui ei el ea le l".split())
+STOPWORDS_EN = frozenset("the a an and or of in on at for with by to from into over under is are was were be as that this those these it we you i they them us our your their".split())
+STOPWORDS_RO = frozenset("și sau ori de din la pe pentru cu prin sub peste într-un într-o în într înspre este sunt eram ești e suntem sunteți un o niște ce că întru către mai prea iar dar să nu nici ci precum căci ai am au îl îți ți îmi mi ți-l își își-l vă vouă ne nouă lui ei el ea le l".split())
+
+# Sentiment lexicons
+POS_EN = frozenset({"love","light","tender","kind","bright","soft","spring","dawn","smile","hope","song","calm"})
+NEG_EN = frozenset({"dark","cold","lonely","broken","empty","tears","storm","fall","fade","ache"})
+POS_RO = frozenset({"iubire","lumină","blând","bun","strălucit","moale","primăvară","zori","zâmbet","speranță","cântec","liniște"})
+NEG_RO = frozenset({"întunecat","rece","singur","frânt","gol","lacrimi","furtună","toamnă","stinge","durere"})
 
 VOWELS_EN = set("aeiouy")
 VOWELS_RO = set("aeiouăîâ")  # simplified
 
 # Romanian diphthongs (approx)
 DIPHTHONGS_RO = ["ea","oa","ia","ie","io","iu","ua","uo","ui","eu","ei","âi","îi"]
+_DIPH_SET = frozenset(DIPHTHONGS_RO)
+
+def _build_rev_trie(words):
+    root = {}
+    for d in words:
+        node = root
+        for ch in reversed(d):
+            node = node.setdefault(ch, {})
+        node["$"] = d
+    return root
+
+# Reversed-diphthong trie: longest suffix match in one walk from the word end
+REV_DIPH_TRIE = _build_rev_trie(DIPHTHONGS_RO)
+
+# Precompiled patterns (used in per-word / per-line hot paths)
+_TOK_RE = re.compile(r"[\w'ăâîșțÁÂĂÎȘȚàèéìòùâêîôûäëïöüœç'-]+")
+_TOK_RE_ASCII = re.compile(r"[\w'-]+", re.ASCII)  # same matches as _TOK_RE on ASCII text
+_CLEAN_RE = re.compile(r"[^a-zăâîșț]")
+_EN_VC_RE = re.compile(r"[aeiouy][^aeiouy]*$")
+_RO_VC_RE = re.compile(r"[aeiouăâî][^aeiouăâî]*$")
+_EN_VGROUP = re.compile(r"[aeiouy]+")
+_RO_VGROUP = re.compile(r"[aeiouăâî*]+")
+_TRAIL_WORD = re.compile(r"\w+$")
+_TRAIL_PUNCT = re.compile(r"\W*$")
+_E_END = re.compile(r"e$")
 
 # -----------------------------
 # Utility NLP helpers
 # -----------------------------
+@functools.lru_cache(maxsize=512)
+def _tokenize(text):
+    text = text.lower()
+    pat = _TOK_RE_ASCII if text.isascii() else _TOK_RE
+    return tuple(w for w in pat.findall(text) if w.strip("-"))
+
 def tokenize(text):
-    return [w for w in re.findall(r"[\w'ăâîșțÁÂĂÎȘȚàèéìòùâêîôûäëïöüœç'-]+", text.lower()) if w.strip("-")]
+    # cached tuple underneath; hand out a fresh list so callers may mutate it
+    return list(_tokenize(text))
 
 def build_bigrams(corpus_lines):
     tokens = []
@@ -65,20 +104,34 @@ def build_bigrams(corpus_lines):
             continue
         toks = ["<s>"] + tokenize(line) + ["</s>"]
         tokens.extend(toks)
-    bigrams = {}
+    bigrams = defaultdict(list)
     for a, b in zip(tokens, tokens[1:]):
-        bigrams.setdefault(a, []).append(b)
-    return bigrams
+        bigrams[a].append(b)
+    # prev -> (unique next tokens, cumulative counts) for weighted sampling
+    table = {}
+    for prev, nexts in bigrams.items():
+        c = Counter(nexts)
+        table[prev] = (list(c.keys()), list(itertools.accumulate(c.values())))
+    return table
+
+# Corpora are constant: tokenize and build the bigram tables once at import
+TOKENIZED_CORPUS = {"en": tokenize(CORPUS_EN), "ro": tokenize(CORPUS_RO)}
+BIGRAMS = {"en": build_bigrams(CORPUS_EN), "ro": build_bigrams(CORPUS_RO)}
+
+# fallback (choices, cum_weights) entry for tables with no "<s>" row
+_END_ONLY = (["</s>"], [1])
 
 def generate_line(bigrams, max_len=9, seed_words=None):
     line = []
     kw = [w.lower() for w in (seed_words or []) if w]
     if kw and random.random() < 0.7:
         line.append(random.choice(kw))
+    rand = random.random
     while True:
         prev = "<s>" if not line else line[-1]
-        nexts = bigrams.get(prev, bigrams.get("<s>", ["</s>"]))
-        nxt = random.choice(nexts)
+        entry = bigrams.get(prev)
+        u, cw = entry if entry is not None else bigrams.get("<s>", _END_ONLY)
+        nxt = u[0] if len(u) == 1 else u[bisect.bisect(cw, rand() * cw[-1])]
         if nxt == "</s>" or len(line) >= max_len:
             break
         line.append(nxt)
@@ -87,39 +140,69 @@ def generate_line(bigrams, max_len=9, seed_words=None):
         s = s[0].upper() + s[1:]
     return s
 
+@functools.lru_cache(maxsize=4096)
 def simple_rhyme_key(word, lang="en"):
-    w = re.sub(r"[^a-zăâîșț]", "", word.lower())
+    w = _CLEAN_RE.sub("", word.lower())
     if lang == "en":
-        m = re.search(r"[aeiouy][^aeiouy]*$", w)
+        m = _EN_VC_RE.search(w)
         return m.group(0) if m else w[-3:]
     else:
-        for d in sorted(DIPHTHONGS_RO, key=len, reverse=True):
-            if w.endswith(d):
-                return d
-        m = re.search(r"[aeiouăâî][^aeiouăâî]*$", w)
+        node, match = REV_DIPH_TRIE, None
+        for ch in reversed(w):
+            node = node.get(ch)
+            if node is None:
+                break
+            match = node.get("$", match)
+        if match:
+            return match
+        m = _RO_VC_RE.search(w)
         return m.group(0) if m else w[-3:]
 
-def last_word(line):
-    toks = tokenize(line)
-    return toks[-1] if toks else ""
+def build_rhyme_index(tokens, lang="en"):
+    index = defaultdict(list)
+    for w in tokens:
+        index[simple_rhyme_key(w, lang)].append(w)
+    return dict(index)
+
+# rhyme_key -> corpus words (with repeats, so picks follow corpus frequency)
+RHYME_INDEX = {lang: build_rhyme_index(toks, lang) for lang, toks in TOKENIZED_CORPUS.items()}
 
+def last_word(line):
+    # same token as tokenize(line)[-1], without building/caching the full token tuple
+    line = line.lower()
+    pat = _TOK_RE_ASCII if line.isascii() else _TOK_RE
+    for w in reversed(pat.findall(line)):
+        if w.strip("-"):
+            return w
+    return ""
+
+@functools.lru_cache(maxsize=4096)
 def approx_syllables(word, lang="en"):
     w = word.lower()
     if not w:
         return 0
     if lang == "en":
-        w = re.sub(r"e$", "", w)
-        groups = re.findall(r"[aeiouy]+", w)
+        w = _E_END.sub("", w)
+        groups = _EN_VGROUP.findall(w)
         return max(1, len(groups))
     else:
-        tmp = w
-        for d in DIPHTHONGS_RO:
-            tmp = tmp.replace(d, "*")
-        groups = re.findall(r"[aeiouăâî*]+", tmp)
+        # single left-to-right pass; all diphthongs are 2 chars long
+        out, i, n = [], 0, len(w)
+        while i < n:
+            if w[i:i+2] in _DIPH_SET:
+                out.append("*")
+                i += 2
+            else:
+                out.append(w[i])
+                i += 1
+        tmp = "".join(out)
+        groups = _RO_VGROUP.findall(tmp)
         return max(1, len(groups))
 
 def line_syllables(line, lang="en"):
-    return sum(approx_syllables(w, lang) for w in tokenize(line))
+    # read-only use: iterate the cached token tuple, no list copy / genexpr frame
+    toks = _tokenize(line)
+    return sum(map(approx_syllables, toks, itertools.repeat(lang, len(toks))))
 
 def rhyme_density(lines, lang="en"):
     keys = [simple_rhyme_key(last_word(l), lang) for l in lines if l.strip()]
@@ -132,32 +215,31 @@ def rhyme_density(lines, lang="en"):
     return paired / max(1, len(keys))
 
 def vocab_variety(text, lang="en"):
-    toks = tokenize(text)
     stop = STOPWORDS_EN if lang == "en" else STOPWORDS_RO
-    content = [t for t in toks if t not in stop]
-    if not content:
-        return 0
-    return len(set(content)) / len(content)
+    uniq, n = set(), 0
+    for t in _tokenize(text):
+        if t not in stop:
+            n += 1
+            uniq.add(t)
+    return len(uniq) / n if n else 0
 
 def sentiment_hint(text, lang="en"):
-    pos_en = {"love","light","tender","kind","bright","soft","spring","dawn","smile","hope","song","calm"}
-    neg_en = {"dark","cold","lonely","broken","empty","tears","storm","fall","fade","ache"}
-    pos_ro = {"iubire","lumină","blând","bun","strălucit","moale","primăvară","zori","zâmbet","speranță","cântec","liniște"}
-    neg_ro = {"întunecat","rece","singur","frânt","gol","lacrimi","furtună","toamnă","stinge","durere"}
-    toks = set(tokenize(text))
-    if lang == "en":
-        score = (len(toks & pos_en) - len(toks & neg_en))
-    else:
-        score = (len(toks & pos_ro) - len(toks & neg_ro))
+    pos, neg = (POS_EN, NEG_EN) if lang == "en" else (POS_RO, NEG_RO)
+    toks = set(_tokenize(text))
+    score = len(toks & pos) - len(toks & neg)
     return "positive" if score > 0 else ("negative" if score < 0 else "neutral")
 
 # -----------------------------
 # Poem generation
 # -----------------------------
 def generate_poem(n_stanzas=2, lines_per_stanza=4, lang="en", keywords=None, scheme="AABB"):
-    corpus = CORPUS_EN if lang == "en" else CORPUS_RO
-    bigrams = build_bigrams(corpus)
+    lang = "en" if lang == "en" else "ro"
+    bigrams = BIGRAMS[lang]
     kw = [k.lower() for k in (keywords or []) if k]
+    # keyword-aware rhyme buckets, merged once per call; only keyword keys copy a list
+    rhyme_index = dict(RHYME_INDEX[lang])
+    for key, words in build_rhyme_index(kw, lang).items():
+        rhyme_index[key] = words + rhyme_index.get(key, [])
 
     def make_stanza(rhyme_targets=None):
         lines = []
@@ -168,31 +250,30 @@ def generate_poem(n_stanzas=2, lines_per_stanza=4, lang="en", keywords=None, sch
             lines.append(base)
         if rhyme_targets:
             for idx_group in rhyme_targets.values():
-                last = last_word(lines[idx_group[0]])
-                key = simple_rhyme_key(last, lang)
+                anchor_key = simple_rhyme_key(last_word(lines[idx_group[0]]), lang)
+                # every word in the bucket rhymes with the anchor, so it can never
+                # equal a mismatching line's last word: pick from it directly
+                bucket = rhyme_index.get(anchor_key)
+                if not bucket:
+                    continue
                 for j in idx_group[1:]:
-                    w = last_word(lines[j])
-                    if simple_rhyme_key(w, lang) != key:
-                        candidates = kw + tokenize(corpus)
-                        random.shuffle(candidates)
-                        for c in candidates:
-                            if simple_rhyme_key(c, lang) == key and c != w:
-                                lines[j] = re.sub(r"\W*$", "", lines[j])
-                                lines[j] = re.sub(r"\w+$", c, lines[j])
-                                break
+                    if simple_rhyme_key(last_word(lines[j]), lang) != anchor_key:
+                        c = random.choice(bucket)
+                        lines[j] = _TRAIL_PUNCT.sub("", lines[j])
+                        lines[j] = _TRAIL_WORD.sub(c, lines[j])
         return lines
 
     def scheme_groups(scheme_str, n_lines):
         scheme_str = (scheme_str or "").upper()
         scheme_str = (scheme_str * ((n_lines // max(1,len(scheme_str)))+1))[:n_lines]
-        groups = {}
+        groups = defaultdict(list)
         for i, ch in enumerate(scheme_str):
-            groups.setdefault(ch, []).append(i)
+            groups[ch].append(i)
         return {k: v for k, v in groups.items() if len(v) > 1}
 
+    groups = scheme_groups(scheme, lines_per_stanza)
     stanzas = []
     for _ in range(max(1, n_stanzas)):
-        groups = scheme_groups(scheme, lines_per_stanza)
         stanzas.append(make_stanza(groups))
     return stanzas
 
@@ -204,14 +285,17 @@ def analyze_poem(text, lang="en", target_syllables=(8,10)):
     if not lines:
         return {"error":"No lines to analyze."}
     sylls = [line_syllables(l, lang) for l in lines]
-    avg = sum(sylls)/len(sylls)
-    dev = (sum((s-avg)**2 for s in sylls)/len(sylls))**0.5
+    # syllable counts take few distinct values: compute stats over a histogram
+    hist = Counter(sylls)
+    n = len(sylls)
+    avg = sum(v*c for v, c in hist.items())/n
+    dev = (sum(c*(v-avg)**2 for v, c in hist.items())/n)**0.5
     rden = rhyme_density(lines, lang)
     vv = vocab_variety(text, lang)
     senti = sentiment_hint(text, lang)
 
     lo, hi = target_syllables
-    meter_fit = sum(1 for s in sylls if lo <= s <= hi)/len(sylls)
+    meter_fit = sum(c for v, c in hist.items() if lo <= v <= hi)/n
 
     score = (
         40 * meter_fit +
@@ -230,7 +314,9 @@ def analyze_poem(text, lang="en", target_syllables=(8,10)):
         notes.append("Vocabular repetitiv; încearcă metafore sau verbe mai precise / Repetitive vocabulary; try fresh images.")
 
     suggestions = []
-    idx_worst = max(range(len(lines)), key=lambda i: abs(((lo+hi)//2) - sylls[i]))
+    mid = (lo+hi)//2
+    worst_dev = max(abs(mid - v) for v in hist)
+    idx_worst = min(sylls.index(v) for v in hist if abs(mid - v) == worst_dev)
     lw = lines[idx_worst]
     if lang == "en":
         suggestions.append(f"Try shortening line {idx_worst+1} by removing a filler word, e.g., '{lw}' → '{' '.join(tokenize(lw)[:-1])}'.")
@@ -366,8 +452,10 @@ class PoemeApp(tk.Tk):
 
         action = ttk.Frame(self)
         action.pack(fill="x", padx=16, pady=(6,16))
-        ttk.Button(action, text="✨ Generate Poem / Generează", style="Accent.TButton", command=self.on_generate).pack(side="left")
-        ttk.Button(action, text="🔍 Analyze / Verifică", style="Pink.TButton", command=self.on_analyze).pack(side="left", padx=8)
+        self.btn_run_generate = ttk.Button(action, text="✨ Generate Poem / Generează", style="Accent.TButton", command=self.on_generate)
+        self.btn_run_generate.pack(side="left")
+        self.btn_run_analyze = ttk.Button(action, text="🔍 Analyze / Verifică", style="Pink.TButton", command=self.on_analyze)
+        self.btn_run_analyze.pack(side="left", padx=8)
 
         self._refresh_mode()
 
@@ -405,6 +493,28 @@ class PoemeApp(tk.Tk):
         self.txt_in.delete("1.0", tk.END)
         self.txt_in.insert("1.0", theme)
 
+    def _set_busy(self, busy):
+        for btn in (self.btn_run_generate, self.btn_run_analyze):
+            btn.state(["disabled"] if busy else ["!disabled"])
+
+    def _run_async(self, job, done):
+        # run job() off the Tk thread; done(result) is posted back to the mainloop
+        self._set_busy(True)
+        def worker():
+            try:
+                result, err = job(), None
+            except Exception as e:
+                result, err = None, e
+            self.after(0, self._finish_async, done, result, err)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _finish_async(self, done, result, err):
+        self._set_busy(False)
+        if err is not None:
+            messagebox.showerror("Error", str(err))
+            return
+        done(result)
+
     def on_generate(self):
         lang = self.lang.get()
         prompt = self.txt_in.get("1.0", tk.END).strip()
@@ -412,25 +522,31 @@ class PoemeApp(tk.Tk):
         n = max(1, int(self.n_stanzas.get()))
         lp = max(2, int(self.lines_per.get()))
         scheme = self.scheme.get().strip().upper() or "AABB"
-
-        stanzas = generate_poem(n_stanzas=n, lines_per_stanza=lp, lang=("en" if lang=="en" else "ro"), keywords=kw or tokenize(prompt), scheme=scheme)
         lo, hi = int(self.target_lo.get()), int(self.target_hi.get())
-        out_lines = []
-        for stanza in stanzas:
-            for line in stanza:
-                s = line
-                syl = line_syllables(s, lang)
-                if syl < lo and (kw or prompt):
-                    append_word = (random.choice(kw) if kw else random.choice(tokenize(prompt)) if tokenize(prompt) else "")
-                    if append_word:
-                        s = s + " " + append_word
-                elif syl > hi:
+
+        def job():
+            prompt_tokens = tokenize(prompt)
+            stanzas = generate_poem(n_stanzas=n, lines_per_stanza=lp, lang=("en" if lang=="en" else "ro"), keywords=kw or prompt_tokens, scheme=scheme)
+            out_lines = []
+            for stanza in stanzas:
+                for line in stanza:
+                    s = line
                     toks = tokenize(s)
-                    if len(toks) > 3:
-                        s = " ".join(toks[:-1]).capitalize()
-                out_lines.append(s)
-            out_lines.append("")
-        text = "\n".join(out_lines).strip()
+                    syl = sum(approx_syllables(w, lang) for w in toks)
+                    if syl < lo and (kw or prompt):
+                        append_word = (random.choice(kw) if kw else random.choice(prompt_tokens) if prompt_tokens else "")
+                        if append_word:
+                            s = s + " " + append_word
+                    elif syl > hi:
+                        if len(toks) > 3:
+                            s = " ".join(toks[:-1]).capitalize()
+                    out_lines.append(s)
+                out_lines.append("")
+            return "\n".join(out_lines).strip()
+
+        self._run_async(job, lambda text: self._finish_generate(lang, text))
+
+    def _finish_generate(self, lang, text):
         header = ("— Poezie generată (RO) —" if lang=="ro" else "— Generated Poem (EN) —")
         self.txt_out.delete("1.0", tk.END)
         self.txt_out.insert("1.0", header+"\n\n"+text)
@@ -442,7 +558,10 @@ class PoemeApp(tk.Tk):
             messagebox.showinfo("Info", "Scrie mai întâi poezia / Write your poem first.")
             return
         lo, hi = int(self.target_lo.get()), int(self.target_hi.get())
-        report = analyze_poem(poem, lang=("en" if lang=="en" else "ro"), target_syllables=(lo,hi))
+        job = lambda: analyze_poem(poem, lang=("en" if lang=="en" else "ro"), target_syllables=(lo,hi))
+        self._run_async(job, lambda report: self._finish_analyze(lang, report))
+
+    def _finish_analyze(self, lang, report):
         if "error" in report:
             self.txt_out.delete("1.0", tk.END)
             self.txt_out.insert("1.0", report["error"])
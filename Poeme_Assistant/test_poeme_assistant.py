@@ -0,0 +1,16 @@
+import time
+
+import poeme_assistant as pa
+
+
+def test_last_word_matches_tokenize():
+    for line in ["the moon is bright tonight", "Luna, plutește blând!", "word --", "x 'quoted'", "İstanbul", ""]:
+        toks = pa.tokenize(line)
+        assert pa.last_word(line) == (toks[-1] if toks else "")
+
+
+def test_last_word_long_token_is_linear():
+    start = time.perf_counter()
+    assert pa.last_word("a" * 20000 + " b") == "b"
+    assert pa.last_word("a-very-long-hyphenated-compound-" * 200 + " end") == "end"
+    assert time.perf_counter() - start < 0.5